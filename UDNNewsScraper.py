@@ -1,16 +1,104 @@
 import re
+import csv
 import time
 import math
 import asyncio
-import pandas as pd
-from playwright.async_api import async_playwright
+from urllib.parse import urljoin, urlparse
+from contextlib import suppress
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
+from selectolax.parser import HTMLParser
 from tqdm import tqdm
 
+# 文章擷取只需要 HTML 和文字，這些資源類型直接擋掉以減少每頁傳輸量
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet", "beacon", "imageset"}
+
+# 已知的廣告/追蹤網域，一併擋掉
+BLOCKED_DOMAINS = {
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "facebook.net",
+    "scorecardresearch.com",
+}
+
+# 熱路徑用到的正則，預先編譯一次
+_NEWS_ID_RE = re.compile(r'news_id=(\d+)')
+_TAIL_ID_RE = re.compile(r'/(\d+)$')
+_DATE_RE = re.compile(r'(\d{4}-\d{2}-\d{2})')
+_PAGE_RE = re.compile(r'page=\d+')
+
+# 輸出 CSV 的欄位順序
+CSV_FIELDS = ['News ID', 'Title', 'Date', 'Content']
+
+# DataFrame 欄位型別：預先宣告 dtype，建表時就定型，
+# 下游 groupby/排序不必再對 object 欄位做逐值雜湊
+SCHEMA = {'News ID': 'string', 'Title': 'string', 'Content': 'string'}
+
+def _build_dataframe(news_data):
+    """
+    把爬取結果轉成 DataFrame
+
+    pandas 在這裡才載入：只要 CSV 檔的呼叫端（return_dataframe=False）
+    不必付 pandas 的載入時間與記憶體
+    """
+    import pandas as pd
+    if news_data:
+        df = pd.DataFrame.from_records(news_data)
+        df = df.astype({col: dtype for col, dtype in SCHEMA.items() if col in df.columns})
+        if 'Date' in df.columns:
+            # 解析失敗的「Unknown date」轉 NaT，整欄保持 datetime64 而非 object
+            df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+        return df
+    return pd.DataFrame(columns=['Title', 'Date', 'Content'])
+
+class PagePool:
+    """
+    Pool of pre-opened Playwright pages shared by concurrent fetch workers
+    """
+
+    def __init__(self):
+        self._pages = asyncio.Queue()
+
+    async def fill(self, context, size):
+        """
+        Pre-open pages into the pool
+
+        Args:
+            context: Playwright BrowserContext to open pages in
+            size (int): Number of pages to pre-open
+        """
+        for _ in range(size):
+            await self._pages.put(await context.new_page())
+
+    async def get(self):
+        """Borrow a page from the pool (waits if all pages are in use)"""
+        return await self._pages.get()
+
+    async def put(self, page):
+        """Return a borrowed page to the pool"""
+        await self._pages.put(page)
+
+    async def close(self):
+        """Close all pages currently in the pool"""
+        while not self._pages.empty():
+            page = self._pages.get_nowait()
+            await page.close()
+
 class UDNNewsScraper:
     """
     Class for scraping news articles from UDN News website using Playwright Async API
+
+    Playwright 與瀏覽器為長駐的類別層級資源，跨多次 scrape() 共用，
+    每次 scrape 只開關自己的 BrowserContext，省掉每次 2-3 秒的瀏覽器冷啟動。
     """
 
+    # 跨實例共用的 Playwright / 瀏覽器（延遲初始化）
+    _shared_playwright = None
+    _shared_browser = None
+    _shared_headless = None
+    _shared_loop = None
+
     def __init__(self, headless=False):
         """
         Initialize the UDN News Scraper
@@ -20,29 +108,101 @@ class UDNNewsScraper:
         """
         self.headless = headless
         self.browser = None
+        self.context = None
         self.page = None
+        self.pool = None
         self.playwright = None
         self.base_url = "https://udndata.com"  # 基礎 URL
         self.progress_callback = None  # 進度回調
+        self._progress_lock = None  # 保護進度回調，避免並發協程同時更新
+
+    @classmethod
+    async def _ensure_browser(cls, headless):
+        """
+        Start (or reuse) the shared Playwright instance and browser.
+
+        Args:
+            headless (bool): Whether the browser should run headless
+        """
+        loop = asyncio.get_running_loop()
+        if cls._shared_playwright is not None and cls._shared_loop is not loop:
+            # 事件迴圈已更換（例如 asyncio.run 的新迴圈），舊資源無法跨迴圈使用
+            cls._shared_playwright = None
+            cls._shared_browser = None
+        if cls._shared_playwright is None:
+            cls._shared_playwright = await async_playwright().start()
+            cls._shared_loop = loop
+
+        # headless 設定改變時（例如切換手動登入）需要重開瀏覽器
+        if cls._shared_browser is not None and (
+                not cls._shared_browser.is_connected() or cls._shared_headless != headless):
+            await cls._shared_browser.close()
+            cls._shared_browser = None
+        if cls._shared_browser is None:
+            cls._shared_browser = await cls._shared_playwright.chromium.launch(headless=headless)
+            cls._shared_headless = headless
+
+    @classmethod
+    async def warmup(cls, headless=True):
+        """
+        Pre-launch the shared browser so the first scrape skips the cold start.
 
-    async def _setup_driver(self):
+        Args:
+            headless (bool): Whether the pre-launched browser should run headless
+        """
+        await cls._ensure_browser(headless)
+
+    async def _setup_driver(self, max_parallel=8):
         """
         Set up Playwright and return a page instance.
 
+        Args:
+            max_parallel (int): Number of pages to pre-open for concurrent fetching
+
         Returns:
             tuple: (page, browser) instances
         """
-        # Use async_playwright()
-        self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.launch(headless=self.headless)
-        self.page = await self.browser.new_page()
+        # Use async_playwright()，首次呼叫才啟動，之後重用長駐的瀏覽器
+        cls = UDNNewsScraper
+        await cls._ensure_browser(self.headless)
+        self.playwright = cls._shared_playwright
+        self.browser = cls._shared_browser
+        # 共用一個 BrowserContext：一個分頁負責搜尋，其餘放入頁面池供並發抓取
+        self.context = await self.browser.new_context()
+        # 擋掉圖片、字型、樣式表與追蹤請求；保留 document/xhr/fetch/script 讓動態內容照常渲染
+        await self.context.route("**/*", self._route_filter)
+        # locator 會自動等待元素出現，預設上限設短一點，真的缺的元素才不會卡住整個流程
+        self.context.set_default_timeout(5000)
+        self.context.set_default_navigation_timeout(20000)
+        self.page = await self.context.new_page()
+        self.pool = PagePool()
+        await self.pool.fill(self.context, max_parallel)
+        self._progress_lock = asyncio.Lock()
         return self.page, self.browser
 
-    async def _fetch_article_content(self, link, index, total):
+    async def _route_filter(self, route):
+        """
+        Abort requests for resources the scraper never reads
+
+        Args:
+            route: Playwright route for the intercepted request
+        """
+        request = route.request
+        if request.resource_type in BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+            return
+        netloc = urlparse(request.url).netloc
+        if any(netloc == domain or netloc.endswith(f".{domain}") for domain in BLOCKED_DOMAINS):
+            await route.abort()
+            return
+        await route.continue_()
+
+    async def _fetch_article_content(self, page, link, index, total):
         """
         Fetch content from a single article
 
         Args:
+            page: Playwright page borrowed from the pool
             link: Article link URL
             index: Article index
             total: Total number of articles
@@ -51,60 +211,92 @@ class UDNNewsScraper:
             dict: Dictionary containing title, date, and content
         """
         try:
-            # 確保 link 是絕對 URL
-            if link.startswith('/'):
-                link = f"{self.base_url}{link}"
-            elif not link.startswith('http'):
-                link = f"{self.base_url}/{link}"
-                
             # 更新進度 - 文章標題暫未知
             if self.progress_callback:
-                self.progress_callback.article_update(index, total)
-                
+                async with self._progress_lock:
+                    self.progress_callback.article_update(index, total)
+
             # print(f"\nProcessing article {index}/{total}: {link}")
 
-            # Open the article page
+            # 快速路徑：文章頁的內文通常不靠 JS 渲染，直接用 context.request 取 HTML
+            #（共用已登入的 cookie，不經過渲染器），看得到標題或內文容器才算命中
+            tree = None
             try:
-                await self.page.goto(link, timeout=30000)  # 增加超時時間到 30 秒
-                await asyncio.sleep(2)
-            except Exception as nav_error:
-                print(f"Navigation error: {nav_error}")
-                return {
-                    'Title': f"Article {index} (navigation failed)",
-                    'Date': "Unknown date",
-                    'Content': f"Content extraction failed: {str(nav_error)}"
-                }
+                response = await self.context.request.get(link, timeout=15000)
+                if response.ok:
+                    candidate = HTMLParser(await response.text())
+                    if candidate.css_first("h1") or candidate.css_first("article, div.article, div.story"):
+                        tree = candidate
+            except Exception as fetch_error:
+                print(f"Direct fetch failed: {fetch_error}, falling back to rendered page")
+
+            if tree is None:
+                # 退路：挑戰頁或需要 JS 的版型，才動用瀏覽器渲染
+                # Open the article page
+                try:
+                    # 暫時性的 DNS/TLS/網路抖動重試幾次再放棄，不要一次失敗就污染輸出列
+                    for attempt in range(3):
+                        try:
+                            await page.goto(link, timeout=20000, wait_until="domcontentloaded")
+                            break
+                        except Exception as retry_error:
+                            if attempt == 2:
+                                raise
+                            print(f"Navigation error (attempt {attempt + 1}/3): {retry_error}, retrying...")
+                            await asyncio.sleep(0.5 * 2 ** attempt)
+                    # 等待內文元素出現即可，不用固定睡 2 秒
+                    await page.wait_for_selector("h1, article, div.article, div.story", timeout=15000)
+                except Exception as nav_error:
+                    print(f"Navigation error: {nav_error}")
+                    return {
+                        'Title': f"Article {index} (navigation failed)",
+                        'Date': "Unknown date",
+                        'Content': f"Content extraction failed: {str(nav_error)}"
+                    }
 
             # Extract news ID from the URL
             news_id = "Unknown ID"
             try:
-                news_id_match = re.search(r'news_id=(\d+)', link)
+                news_id_match = _NEWS_ID_RE.search(link)
                 if news_id_match:
                     news_id = news_id_match.group(1)
                 else:
-                    alt_id_match = re.search(r'/(\d+)$', link)
+                    alt_id_match = _TAIL_ID_RE.search(link)
                     if alt_id_match:
                         news_id = alt_id_match.group(1)
             except Exception as id_error:
                 print(f"Error extracting news ID: {id_error}")
 
+            if tree is None:
+                # 一次取回整頁 HTML，之後的欄位擷取全部在本地解析，避免逐欄位的 CDP 往返
+                html = await page.content()
+                tree = HTMLParser(html)
+
             # Extract title
             try:
-                title_element = await self.page.query_selector("h1")
-                title = await title_element.inner_text() if title_element else f"Article {index} (title extraction failed)"
-                
+                title_element = tree.css_first("h1")
+                title = title_element.text(strip=True) if title_element else f"Article {index} (title extraction failed)"
+
                 # 更新進度 - 包含實際標題
                 if self.progress_callback:
-                    self.progress_callback.article_update(index, total, title)
+                    async with self._progress_lock:
+                        self.progress_callback.article_update(index, total, title)
             except:
                 title = f"Article {index} (title extraction failed)"
 
             # Extract date
             try:
-                date_element = await self.page.query_selector("span.story-source")
-                date_text = await date_element.inner_text() if date_element else "Unknown date"
-                date_match = re.search(r'(\d{4}-\d{2}-\d{2})', date_text)
-                article_date = date_match.group(1) if date_match else "Unknown date"
+                date_element = tree.css_first("span.story-source")
+                date_text = date_element.text() if date_element else ""
+                # date_text 形如「聯合報 2025-03-11 14:20」，逐 token 檢查比整串跑正則快
+                article_date = next(
+                    (p for p in date_text.split() if len(p) == 10 and p[4] == '-' and p[7] == '-'),
+                    None
+                )
+                if article_date is None:
+                    # 版型不同、日期黏在其他文字裡時才退回正則
+                    date_match = _DATE_RE.search(date_text)
+                    article_date = date_match.group(1) if date_match else "Unknown date"
             except:
                 article_date = "Unknown date"
 
@@ -117,14 +309,13 @@ class UDNNewsScraper:
                     "div.content",
                     "div.story"
                 ]
-                
+
                 for selector in selectors:
-                    content_element = await self.page.query_selector(selector)
+                    content_element = tree.css_first(selector)
                     if content_element:
-                        paragraphs = await content_element.query_selector_all("p")
                         content_parts = []
-                        for p in paragraphs:
-                            p_text = await p.inner_text()
+                        for p in content_element.css("p"):
+                            p_text = p.text(strip=True)
                             if p_text:
                                 content_parts.append(p_text)
                         content = "\n".join(content_parts)
@@ -132,8 +323,11 @@ class UDNNewsScraper:
                             break
 
                 if not content:
-                    body_element = await self.page.query_selector("body")
-                    content = await body_element.inner_text() if body_element else "Content extraction failed"
+                    # 退路：整頁文字動輒數百 KB 且大多無用，先拔掉非內文節點再截斷
+                    for node in tree.css("script,style,nav,footer,header"):
+                        node.decompose()
+                    body_text = tree.body.text(separator="\n", strip=True) if tree.body else ""
+                    content = body_text[:20000] or "Content extraction failed"
             except:
                 content = "Content extraction failed"
 
@@ -151,31 +345,26 @@ class UDNNewsScraper:
                 'Content': f"Content extraction failed: {str(e)}"
             }
 
-    async def scrape(self, keyword, start_date, end_date, output_file=None, manual_mode=False, max_pages=None, max_articles=50, progress_callback=None):
+    async def scrape_iter(self, keyword, start_date, end_date, manual_mode=False, max_pages=None, max_articles=50, max_parallel=8, progress_callback=None):
         """
-        Main scraping method to fetch news articles based on search criteria
+        Async generator that yields articles as soon as each fetch completes
+
+        呼叫端在第一篇文章抓完時就能開始處理，不必等整批結束；
+        scrape() 即是以此為基礎組出 CSV / DataFrame 的批次介面
 
         Args:
-            keyword (str): Search keyword
-            start_date (str): Start date in yyyy-mm-dd format
-            end_date (str): End date in yyyy-mm-dd format
-            output_file (str): Output CSV filename
-            manual_mode (bool): Whether to enable manual login mode
-            max_pages (int): Maximum number of pages to scrape
-            max_articles (int): Maximum number of articles to scrape
-            progress_callback: Optional callback for progress updates
+            參數意義同 scrape（不含 output_file / return_dataframe）
 
-        Returns:
-            DataFrame: Pandas DataFrame containing the scraped news data
+        Yields:
+            tuple: (index, article_dict)，index 為文章在搜尋結果中的序號（從 1 起算）
         """
         # 保存進度回調
         self.progress_callback = progress_callback
-        
+
         # Initialize Playwright and browser
-        page, browser = await self._setup_driver()
+        page, browser = await self._setup_driver(max_parallel=max_parallel)
 
-        # List to store news data
-        news_data = []
+        pipeline_task = None
 
         try:
             # 更新進度 - 開始階段
@@ -193,9 +382,12 @@ class UDNNewsScraper:
                 if self.progress_callback:
                     self.progress_callback.stage_update("嘗試登入")
                     
-                login_link = await page.query_selector("a:has-text('定址登入')")
-                if login_link:
-                    await login_link.click()
+                # locator 自動等待並在伺服器端取用元素，一次往返完成「找到就點」
+                login_clicked = False
+                with suppress(PlaywrightTimeout):
+                    await page.locator("a:has-text('定址登入')").first.click(timeout=3000)
+                    login_clicked = True
+                if login_clicked:
                     print("Clicked '定址登入' link")
 
                     # Wait for the manual login if required
@@ -208,54 +400,56 @@ class UDNNewsScraper:
                         await asyncio.to_thread(input)
 
                     # Wait for the page to load after login
-                    await asyncio.sleep(3)
+                    await page.wait_for_load_state("domcontentloaded")
                 else:
                     print("Login link not found, skipping login process.")
             except Exception as e:
                 print(f"Error when clicking 'IP Login': {e}")
                 print("Continuing with search process...")
 
-            # Return to search page (if redirected to another page after login)
+            # 登入後通常仍停在搜尋頁，等下一步要用的搜尋框出現即可；
+            # 只有真的被導去別的頁面時才需要再載入一次搜尋頁
             if self.progress_callback:
                 self.progress_callback.stage_update("輸入搜尋條件")
-                
-            await page.goto(f"{self.base_url}/ndapp/Index?cp=udn")
+
+            try:
+                await page.wait_for_selector("#SearchString", timeout=10000)
+            except Exception:
+                await page.goto(f"{self.base_url}/ndapp/Index?cp=udn")
 
             # Enter search keyword
-            search_input = await page.query_selector("#SearchString")
-            await search_input.fill(keyword)
+            await page.locator("#SearchString").fill(keyword)
             print(f"Entered keyword: {keyword}")
 
             # Enter start date
-            start_date_input = await page.query_selector("#datepicker-start")
-            await start_date_input.fill(start_date)
+            await page.locator("#datepicker-start").fill(start_date)
 
             # Enter end date
-            end_date_input = await page.query_selector("#datepicker-end")
-            await end_date_input.fill(end_date)
+            await page.locator("#datepicker-end").fill(end_date)
 
             # Click the search button
             if self.progress_callback:
                 self.progress_callback.stage_update("執行搜尋")
-                
-            submit_button = await page.query_selector("button[name='submit']")
-            await submit_button.click()
+
+            await page.locator("button[name='submit']").click()
             print("Clicked search button")
 
-            # Wait for results page to load
-            await asyncio.sleep(5)
+            # Wait for results page to load (搜尋結果列表出現即可繼續)
+            try:
+                await page.wait_for_selector("h2.control-pic a", timeout=15000)
+            except Exception:
+                # 沒有任何結果時列表不會出現，留一小段緩衝給晚到的 XHR 渲染
+                await page.wait_for_timeout(500)
 
             # Get total result count and calculate total pages
             if self.progress_callback:
                 self.progress_callback.stage_update("分析搜尋結果")
                 
-            result_message = await page.query_selector("div.message")
-            result_text = await result_message.inner_text() if result_message else ""
-            
-            # 獲取頁面原始碼檢查總結果數
-            page_content = await page.content()
-            total_results_match = re.search(r'共搜尋到\s*<span class="mark">(\d+)</span>筆資料', page_content)
-            total_results = int(total_results_match.group(1)) if total_results_match else 0
+            # 直接讀取「共搜尋到 N 筆資料」的數字節點，不用把整頁 HTML 拉回來跑正則
+            total_results = 0
+            with suppress(PlaywrightTimeout, ValueError):
+                total_text = await page.locator("div.message span.mark").first.inner_text(timeout=2000)
+                total_results = int(total_text.strip())
             
             # 計算需要的頁數
             # 修改：如果 max_articles < 20，只抓取一頁
@@ -274,123 +468,228 @@ class UDNNewsScraper:
             # 顯示頁數計算的詳細信息
             print(f"Total results: {total_results}, Max articles: {max_articles}, Calculated pages: {calculated_pages}, Final total pages: {total_pages}")
             
-            # Store all news links and titles
-            news_links = []
+            # 預估要抓的文章數，供進度顯示使用（producer 還在收集時就要開抓）
+            expected_total = min(total_results, max_articles) if total_results else max_articles
 
-            # 更新進度 - 開始抓取頁面
+            # 更新進度 - 開始抓取（連結收集與內容抓取以 pipeline 重疊進行）
             if self.progress_callback:
-                self.progress_callback.stage_update("抓取文章連結")
+                self.progress_callback.stage_update("抓取文章連結與內容")
                 self.progress_callback.page_update(0, total_pages)
-            
-            # 處理每一頁結果
-            for current_page in range(1, total_pages + 1):
-                # 更新進度 - 當前頁面
-                if self.progress_callback:
-                    self.progress_callback.page_update(current_page, total_pages)
-                    
-                if current_page > 1:
-                    # Navigate to next page
-                    current_url = page.url
-                    if 'page=' in current_url:
-                        next_page_url = re.sub(r'page=\d+', f'page={current_page}', current_url)
+                self.progress_callback.article_update(0, expected_total)
+
+            # Producer/consumer pipeline：翻頁收集連結的同時，消費者已經在抓文章內容，
+            # 不必等全部連結收集完才開始抓
+            queue = asyncio.Queue(maxsize=max_articles)
+            num_workers = max(1, min(max_parallel, max_articles))
+
+            # 完成的文章經由輸出佇列交給呼叫端，哨兵物件標記 pipeline 結束
+            out_queue = asyncio.Queue()
+            done_sentinel = object()
+
+            async def _producer():
+                """逐頁收集 (序號, 標題, 連結) 丟進佇列，收滿 max_articles 或翻完即送出結束哨兵"""
+                collected = 0
+                for current_page in range(1, total_pages + 1):
+                    # 更新進度 - 當前頁面
+                    if self.progress_callback:
+                        self.progress_callback.page_update(current_page, total_pages)
+
+                    if current_page > 1:
+                        # Fetch next page over plain HTTP
+                        current_url = page.url
+                        if 'page=' in current_url:
+                            next_page_url = _PAGE_RE.sub(f'page={current_page}', current_url)
+                        else:
+                            separator = '&' if '?' in current_url else '?'
+                            next_page_url = f"{current_url}{separator}page={current_page}"
+
+                        # 列表頁只需要讀 20 個 <a>，不值得再跑一次完整渲染；
+                        # 用 context.request 取 HTML（共用已登入的 cookie）後本地解析
+                        print(f"Fetching page {current_page}: {next_page_url}")
+                        response = await self.context.request.get(next_page_url)
+                        html = await response.text()
+                        items = [
+                            (a.text(strip=True), a.attributes.get('href'))
+                            for a in HTMLParser(html).css("h2.control-pic a")
+                        ]
                     else:
-                        separator = '&' if '?' in current_url else '?'
-                        next_page_url = f"{current_url}{separator}page={current_page}"
-                    
-                    print(f"Navigating to page {current_page}: {next_page_url}")
-                    await page.goto(next_page_url)
-                    await asyncio.sleep(3)
-
-                # Get news links and titles from current page
-                title_elements = await page.query_selector_all("h2.control-pic a")
-                for title_element in title_elements:
-                    title = await title_element.inner_text()
-                    link = await title_element.get_attribute('href')
-                    
-                    # 確保連結是絕對 URL
-                    if link and link.startswith('/'):
-                        link = f"{self.base_url}{link}"
-                    
-                    # print(f"Found article: {title} - {link}")
-                    news_links.append((title, link))
-                    
-                    # 如果已經收集到足夠的連結，提前退出收集循環
-                    if len(news_links) >= max_articles:
-                        print(f"Collected {len(news_links)} links, which is enough for max_articles={max_articles}. Stopping collection.")
+                        # Get news links and titles from current page
+                        # 第一頁已由瀏覽器渲染好，一次 evaluate 取回整頁的 (標題, 連結)
+                        items = await page.eval_on_selector_all(
+                            "h2.control-pic a",
+                            "els => els.map(e => [e.innerText, e.getAttribute('href')])"
+                        )
+                    for title, link in items:
+                        # 收集時就轉成絕對 URL，urljoin 統一處理相對與絕對路徑，
+                        # 抓取端不必每篇文章再判斷一次連結形狀
+                        link = urljoin(self.base_url, link) if link else link
+
+                        # print(f"Found article: {title} - {link}")
+                        collected += 1
+                        await queue.put((collected, title, link))
+
+                        # 如果已經收集到足夠的連結，提前退出收集循環
+                        if collected >= max_articles:
+                            print(f"Collected {collected} links, which is enough for max_articles={max_articles}. Stopping collection.")
+                            break
+
+                    # 如果已經收集到足夠的連結，提前退出頁面循環
+                    if collected >= max_articles:
                         break
-                
-                # 如果已經收集到足夠的連結，提前退出頁面循環
-                if len(news_links) >= max_articles:
+
+                print(f"Total links collected: {collected}")
+                # 通知所有消費者收工
+                for _ in range(num_workers):
+                    await queue.put(None)
+
+            async def _consumer():
+                """從佇列取出連結，借一個分頁抓內容，完成後交給輸出佇列"""
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        break
+                    index, title, link = item
+                    worker_page = await self.pool.get()
+                    try:
+                        article_data = await self._fetch_article_content(worker_page, link, index, expected_total)
+                    except Exception as e:
+                        print(f"Error processing news: {e}")
+                        article_data = {
+                            'Title': title,
+                            'Date': "Unknown date",
+                            'Content': f"Content extraction failed: {str(e)}"
+                        }
+                    finally:
+                        await self.pool.put(worker_page)
+                    await out_queue.put((index, article_data))
+
+            # pipeline 丟到背景 task 執行，本協程只負責把完成的文章逐一 yield 出去
+            pipeline = asyncio.gather(_producer(), *[_consumer() for _ in range(num_workers)])
+            pipeline_task = asyncio.ensure_future(pipeline)
+            pipeline_task.add_done_callback(lambda _task: out_queue.put_nowait(done_sentinel))
+
+            while True:
+                item = await out_queue.get()
+                if item is done_sentinel:
                     break
+                yield item
 
-            # 確保不超過 max_articles
-            news_links = news_links[:min(len(news_links), max_articles)]
-            print(f"Total links collected: {len(news_links)}")
+            # pipeline 若有例外，在這裡重新拋給呼叫端
+            await pipeline_task
 
-            # 更新進度 - 開始抓取文章內容
+        finally:
+            # 呼叫端提早中斷（break / aclose）時把還在跑的 pipeline 收掉
+            if pipeline_task is not None and not pipeline_task.done():
+                pipeline_task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await pipeline_task
+
+            # 更新進度 - 完成
             if self.progress_callback:
-                self.progress_callback.stage_update("抓取文章內容")
-                self.progress_callback.article_update(0, len(news_links))
-                
-            # 抓取每篇文章內容
-            for index, (title, link) in enumerate(news_links, 1):
-                try:
-                    article_data = await self._fetch_article_content(link, index, len(news_links))
-                    news_data.append(article_data)
-                except Exception as e:
-                    print(f"Error processing news: {e}")
-                    news_data.append({
-                        'Title': title,
-                        'Date': "Unknown date",
-                        'Content': f"Content extraction failed: {str(e)}"
-                    })
+                self.progress_callback.stage_update("完成爬取")
+
+            # 只關閉本次使用的 context，瀏覽器保持長駐供下次重用
+            await self.close()
+
+    async def scrape(self, keyword, start_date, end_date, output_file=None, manual_mode=False, max_pages=None, max_articles=50, max_parallel=8, progress_callback=None, return_dataframe=True):
+        """
+        Main scraping method to fetch news articles based on search criteria
+
+        以 scrape_iter 為基礎的批次介面：邊收文章邊寫 CSV，最後彙整成 DataFrame
+
+        Args:
+            keyword (str): Search keyword
+            start_date (str): Start date in yyyy-mm-dd format
+            end_date (str): End date in yyyy-mm-dd format
+            output_file (str): Output CSV filename
+            manual_mode (bool): Whether to enable manual login mode
+            max_pages (int): Maximum number of pages to scrape
+            max_articles (int): Maximum number of articles to scrape
+            max_parallel (int): Maximum number of articles fetched concurrently
+            progress_callback: Optional callback for progress updates
+            return_dataframe (bool): Whether to build and return a DataFrame
+                (False skips the pandas import entirely for CSV-only callers)
+
+        Returns:
+            DataFrame: Pandas DataFrame containing the scraped news data,
+                or None when return_dataframe is False
+        """
+        # 以序號為 key 收集結果，輸出順序不受完成先後影響
+        collected = {}
+
+        # 增量輸出用的 CSV 檔案與 writer（有指定 output_file 才開啟）
+        csv_file = None
+        csv_writer = None
+
+        try:
+            # 增量寫出 CSV：每抓完一篇就寫一列並 flush，中途失敗也保得住已完成的進度
+            if output_file:
+                csv_file = open(output_file, 'w', newline='', encoding='utf-8-sig')
+                csv_writer = csv.DictWriter(csv_file, fieldnames=CSV_FIELDS, extrasaction='ignore', restval="")
+                csv_writer.writeheader()
+
+            async for index, article_data in self.scrape_iter(
+                    keyword, start_date, end_date,
+                    manual_mode=manual_mode,
+                    max_pages=max_pages,
+                    max_articles=max_articles,
+                    max_parallel=max_parallel,
+                    progress_callback=progress_callback):
+                if csv_writer:
+                    csv_writer.writerow(article_data)
+                    csv_file.flush()
+                collected[index] = article_data
+
+            news_data = [collected[i] for i in sorted(collected)]
 
             # 更新進度 - 處理結果
             if self.progress_callback:
                 self.progress_callback.stage_update("處理爬取結果")
 
-            # Create DataFrame and save to CSV if output file is specified
+            # Create DataFrame (CSV 已在抓取過程中逐列寫出)
             if news_data:
-                df = pd.DataFrame(news_data)
                 if output_file:
-                    df.to_csv(output_file, index=False, encoding='utf-8-sig')
                     print(f"\nSuccessfully saved {len(news_data)} articles to {output_file}")
-                return df
             else:
                 print("No news content extracted")
-                return pd.DataFrame(columns=['Title', 'Date', 'Content'])
+            return _build_dataframe(news_data) if return_dataframe else None
 
         except Exception as e:
             print(f"Error occurred: {e}")
-            if news_data:
-                df = pd.DataFrame(news_data)
-                if output_file:
-                    df.to_csv(output_file, index=False, encoding='utf-8-sig')
-                    print(f"Saved partial data ({len(news_data)} articles) to {output_file}")
-                return df
-            return pd.DataFrame(columns=['Title', 'Date', 'Content'])
+            # 中途失敗時，已完成的文章仍彙整成部分結果
+            news_data = [collected[i] for i in sorted(collected)]
+            if news_data and output_file:
+                print(f"Saved partial data ({len(news_data)} articles) to {output_file}")
+            return _build_dataframe(news_data) if return_dataframe else None
 
         finally:
-            # 更新進度 - 完成
-            if self.progress_callback:
-                self.progress_callback.stage_update("完成爬取")
-                
-            if self.browser:
-                await self.browser.close()
-                print("Browser closed")
-            if self.playwright:
-                await self.playwright.stop()
+            if csv_file:
+                csv_file.close()
 
     async def close(self):
-        """Close the browser if still open"""
-        if self.browser:
-            await self.browser.close()
-        if self.playwright:
-            await self.playwright.stop()
+        """Close this run's pages and context; the shared browser stays warm"""
+        if self.pool:
+            await self.pool.close()
+            self.pool = None
+        if self.context:
+            await self.context.close()  # 會一併關閉 context 底下的分頁
+            self.context = None
+            self.page = None
+            print("Context closed (browser kept alive)")
+
+    @classmethod
+    async def shutdown(cls):
+        """Shut down the shared browser and Playwright (call once at process exit)"""
+        if cls._shared_browser:
+            await cls._shared_browser.close()
+            cls._shared_browser = None
+        if cls._shared_playwright:
+            await cls._shared_playwright.stop()
+            cls._shared_playwright = None
         print("Browser closed")
 
 # 新增一個執行主函數的函數
-async def run_scraper(keyword, start_date, end_date, output_file=None, manual_mode=False, max_pages=None, max_articles=50, headless=False, progress_callback=None):
+async def run_scraper(keyword, start_date, end_date, output_file=None, manual_mode=False, max_pages=None, max_articles=50, headless=False, progress_callback=None, return_dataframe=True):
     """
     運行爬蟲的主函數，方便在 Jupyter 中調用
 
@@ -404,9 +703,10 @@ async def run_scraper(keyword, start_date, end_date, output_file=None, manual_mo
         max_articles (int): 最多抓取的文章數
         headless (bool): 是否啟用無頭模式
         progress_callback: 進度回調物件
+        return_dataframe (bool): 是否建立並回傳 DataFrame（False 時完全不載入 pandas）
 
     Returns:
-        DataFrame: 包含爬取的新聞資料的 Pandas DataFrame
+        DataFrame: 包含爬取的新聞資料的 Pandas DataFrame，return_dataframe=False 時為 None
     """
     scraper = UDNNewsScraper(headless=headless)
     try:
@@ -418,13 +718,14 @@ async def run_scraper(keyword, start_date, end_date, output_file=None, manual_mo
             manual_mode=manual_mode,
             max_pages=max_pages,
             max_articles=max_articles,
-            progress_callback=progress_callback
+            progress_callback=progress_callback,
+            return_dataframe=return_dataframe
         )
     finally:
         await scraper.close()
 
 # 提供一個同步的接口，方便在非異步環境中調用
-def scrape_news(keyword, start_date, end_date, output_file=None, manual_mode=False, max_pages=None, max_articles=50, headless=False, progress_callback=None):
+def scrape_news(keyword, start_date, end_date, output_file=None, manual_mode=False, max_pages=None, max_articles=50, headless=False, progress_callback=None, return_dataframe=True):
     """
     同步接口，用於在非異步環境中調用爬蟲
 
@@ -432,19 +733,31 @@ def scrape_news(keyword, start_date, end_date, output_file=None, manual_mode=Fal
         參數同 run_scraper
 
     Returns:
-        DataFrame: 包含爬取的新聞資料的 Pandas DataFrame
+        DataFrame: 包含爬取的新聞資料的 Pandas DataFrame，return_dataframe=False 時為 None
     """
-    import nest_asyncio
-    nest_asyncio.apply()  # 啟用嵌套事件循環支持
-    
-    return asyncio.get_event_loop().run_until_complete(run_scraper(
-        keyword=keyword,
-        start_date=start_date,
-        end_date=end_date,
-        output_file=output_file,
-        manual_mode=manual_mode,
-        max_pages=max_pages,
-        max_articles=max_articles,
-        headless=headless,
-        progress_callback=progress_callback
-    ))
\ No newline at end of file
+    from concurrent.futures import ThreadPoolExecutor
+
+    async def _main():
+        try:
+            return await run_scraper(
+                keyword=keyword,
+                start_date=start_date,
+                end_date=end_date,
+                output_file=output_file,
+                manual_mode=manual_mode,
+                max_pages=max_pages,
+                max_articles=max_articles,
+                headless=headless,
+                progress_callback=progress_callback,
+                return_dataframe=return_dataframe
+            )
+        finally:
+            # asyncio.run 每次都會關閉事件迴圈，長駐瀏覽器無法跨迴圈重用，這裡一併收掉
+            await UDNNewsScraper.shutdown()
+
+    def _run():
+        return asyncio.run(_main())
+
+    # 在獨立執行緒用 asyncio.run 執行，即使呼叫端（Jupyter 等）已有事件迴圈也不需要 nest_asyncio
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(_run).result()
\ No newline at end of file
@@ -10,11 +10,14 @@ def install_playwright_browsers():
         st.info("正在安裝 Playwright 瀏覽器，這可能需要幾分鐘時間...")
         
         # 執行安裝命令
+        # stdout 用不到就不收集，只留 stderr 供錯誤訊息；加上 timeout 避免安裝卡死
         result = subprocess.run(
             ["playwright", "install", "chromium"],
-            capture_output=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
             text=True,
-            check=False
+            check=False,
+            timeout=600
         )
         
         # 檢查安裝結果
@@ -29,13 +32,23 @@ def install_playwright_browsers():
         return False
 
 # 檢查瀏覽器是否已安裝
+# cache_resource：每個行程只檢查一次，rerun 不會重複付 subprocess 的成本
+@st.cache_resource
 def is_browser_installed():
     """檢查 Playwright 的 Chromium 瀏覽器是否已安裝"""
-    # Playwright 的 Chromium 瀏覽器路徑
-    browser_path = os.path.expanduser("~/.cache/ms-playwright/chromium-*/chrome-linux/chrome")
-    
-    # 使用 glob 模組查找匹配的路徑
-    import glob
-    browser_paths = glob.glob(browser_path)
-    
-    return len(browser_paths) > 0
\ No newline at end of file
+    # 用 dry-run 問出 playwright 自己算好的安裝路徑（跨平台），
+    # 再檢查該路徑是否存在；dry-run 不論裝沒裝都回傳 0，不能拿 returncode 判斷
+    try:
+        result = subprocess.run(
+            ["playwright", "install", "--dry-run", "chromium"],
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+        for line in result.stdout.splitlines():
+            if "install location" in line.lower():
+                location = line.split(":", 1)[1].strip()
+                return bool(location) and os.path.exists(location)
+        return False
+    except Exception:
+        return False
\ No newline at end of file
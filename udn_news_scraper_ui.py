@@ -1,68 +1,110 @@
 import streamlit as st
 from datetime import date
-import pandas as pd
 import asyncio
-import nest_asyncio
+import threading
+import queue
 import sys
 import subprocess
 import os
-
-# 啟用嵌套事件循環支持，讓 asyncio 可以在 Streamlit 中工作
-nest_asyncio.apply()
+import glob
+import time
+import hashlib
+import tempfile
 
 # 檢查並安裝 Playwright 瀏覽器
-def install_playwright_browser():
+# cache_resource：每個行程只真正執行一次，widget 互動造成的 rerun 不再付 subprocess 的成本
+@st.cache_resource
+def ensure_browser():
     try:
+        # 先看本機快取有沒有瀏覽器，有就直接命中，連 subprocess 都不用開
+        chrome_glob = os.path.expanduser("~/.cache/ms-playwright/chromium-*/chrome-linux/chrome")
+        if glob.glob(chrome_glob):
+            return True
+
         with st.spinner("正在設置 Playwright 瀏覽器，請稍候..."):
-            # 先檢查 Playwright 是否已安裝瀏覽器
-            browser_exists = False
-            try:
-                # 這段程式碼會檢查瀏覽器是否已安裝
-                result = subprocess.run(
-                    ["playwright", "install", "chromium", "--help"], 
-                    capture_output=True,
-                    text=True
-                )
-                browser_exists = "already installed" in result.stdout or "已經安裝" in result.stdout
-            except:
-                pass
-            
-            if not browser_exists:
-                st.info("正在安裝 Playwright 瀏覽器，這可能需要幾分鐘時間...")
-                result = subprocess.run(
-                    ["playwright", "install", "chromium"],
-                    capture_output=True,
-                    text=True
-                )
-                if result.returncode != 0:
-                    st.error(f"Playwright 瀏覽器安裝失敗: {result.stderr}")
-                    st.info("將嘗試使用內置的 Chromium")
-                else:
-                    st.success("Playwright 瀏覽器安裝成功！")
+            st.info("正在安裝 Playwright 瀏覽器，這可能需要幾分鐘時間...")
+            # 用 -m playwright 執行，PATH 上沒有 playwright 指令時也能運作
+            # stdout 用不到就不收集，只留 stderr 供錯誤訊息；加上 timeout 避免安裝卡死整個行程
+            result = subprocess.run(
+                [sys.executable, "-m", "playwright", "install", "chromium", "--with-deps"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                check=False,
+                timeout=600
+            )
+            if result.returncode != 0:
+                st.error(f"Playwright 瀏覽器安裝失敗: {result.stderr}")
+                st.info("將嘗試使用內置的 Chromium")
+                return False
+            st.success("Playwright 瀏覽器安裝成功！")
+            return True
     except Exception as e:
         st.warning(f"無法安裝 Playwright 瀏覽器: {str(e)}")
         st.info("將嘗試使用內置的 Chromium")
+        return False
 
-# 運行安裝
-install_playwright_browser()
+# 運行安裝（快取命中時為 no-op）
+ensure_browser()
 
-# 導入 UDNNewsScraper
-try:
+# 每次爬取建一個新的爬蟲實例：建構成本極低，而 context/page/pool 等
+# 都是單次爬取的狀態，跨 session 共用同一個實例會在並發時互踩；
+# 真正貴的 Playwright 與瀏覽器由 UDNNewsScraper 在類別層級長駐共用
+# import 放在函數內：UDNNewsScraper 會連動載入 Playwright，
+# 冷啟動與純瀏覽的 rerun 不必付這筆 import 成本
+def make_scraper(headless: bool):
     from UDNNewsScraper import UDNNewsScraper
-except ImportError as e:
-    st.error(f"無法導入 UDNNewsScraper: {str(e)}")
-    st.stop()
+    return UDNNewsScraper(headless=headless)
+
+# 長駐的背景事件迴圈：所有爬取協程都丟進同一個迴圈執行，
+# 迴圈不會隨單次爬取結束而關閉，長駐瀏覽器才能跨次重用
+@st.cache_resource
+def get_background_loop():
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+# App 啟動時就在背景迴圈預熱共用瀏覽器，
+# 第一次點「開始爬取」不必在 spinner 裡等 Chromium 冷啟動
+# cache_resource：只提交一次，rerun 不會重複預熱
+@st.cache_resource
+def warm_browser():
+    async def _warm():
+        # import 放在協程內，讓 Playwright 的 import 成本也落在背景執行緒
+        from UDNNewsScraper import UDNNewsScraper
+        await UDNNewsScraper.warmup(headless=True)
+    # 只提交不等待，首次渲染不被預熱擋住
+    return asyncio.run_coroutine_threadsafe(_warm(), get_background_loop())
 
-import base64
+warm_browser()
 
-# 創建下載連結的函數，使用簡單的 HTML 連結而非自定義樣式
-def get_csv_download_link(df, filename="data.csv"):
-    """生成 CSV 下載連結，使用默認樣式"""
-    csv = df.to_csv(index=False, encoding='utf-8-sig')
-    csv_bytes = csv.encode('utf-8-sig')
-    b64 = base64.b64encode(csv_bytes).decode()
-    href = f'<a href="data:file/csv;base64,{b64}" download="{filename}">下載爬取資料</a>'
-    return href
+# 下載走 st.download_button：bytes 由 Streamlit 自己的端點送出，
+# 不必 base64 塞進 DOM；序列化結果用 cache_data 記住
+# 快取 key 用 DataFrame 的物件 id：結果物件存活在 session_state，
+# rerun 時不必為了算快取 key 把幾 MB 的內容整個重新雜湊一次
+# 舊物件被回收後 id 可能被新 DataFrame 重用，所以 cache_key 再摻入
+# 每次爬取遞增的世代序號與列數，避免撞 id 時回傳上一份結果的 bytes
+@st.cache_data(show_spinner=False, hash_funcs={"pandas.core.frame.DataFrame": id})
+def get_csv_bytes(df, cache_key):
+    """把 DataFrame 序列化成 utf-8-sig 編碼的 CSV bytes"""
+    return df.to_csv(index=False).encode('utf-8-sig')
+
+@st.cache_data(show_spinner=False, hash_funcs={"pandas.core.frame.DataFrame": id})
+def get_parquet_bytes(df, cache_key):
+    """把 DataFrame 序列化成 zstd 壓縮的 Parquet bytes（比 CSV 小、重載快）"""
+    return df.to_parquet(index=False, compression="zstd")
+
+# 預覽只要前 10 筆：iloc 切片回傳檢視而非複本，
+# 並以物件 id 記住結果，rerun 時直接重用同一個切片物件
+@st.cache_data(show_spinner=False, hash_funcs={"pandas.core.frame.DataFrame": id})
+def get_preview(df, cache_key):
+    """取 DataFrame 的前 10 筆切片供預覽表格使用"""
+    return df.iloc[:10]
+
+# 同一組查詢參數的結果落地成 feather 檔，rerun/重啟時毫秒級載回，不必重爬
+def _result_cache_path(keyword, start_date, end_date):
+    key = hashlib.md5(f"{keyword}|{start_date}|{end_date}".encode()).hexdigest()
+    return os.path.join(tempfile.gettempdir(), f"udn_{key}.feather")
 
 def main():
     st.title("UDN News Scraper")
@@ -79,14 +121,30 @@ def main():
         headless = st.checkbox("無頭模式 (不顯示瀏覽器)", value=True)
         manual_mode = st.checkbox("手動登入模式", value=False)
         max_articles = st.number_input("最大爬取文章數", min_value=1, max_value=200, value=10)
+        max_parallel = st.number_input("最大並行抓取數", min_value=1, max_value=16, value=4)
     
+    # 爬取結果掛在 session_state 上，勾選框等互動造成的 rerun 不會弄丟結果
+    # df_path 記住結果對應的快取檔，用來判斷 session 裡的結果是否還對應目前參數
+    if "df" not in st.session_state:
+        st.session_state.df = None
+        st.session_state.df_path = None
+        # 世代序號：每載入一份新結果就遞增，作為序列化快取 key 的一部分
+        st.session_state.df_gen = 0
+
     # 開始爬取的按鈕
+    df = None
+    scraped = False
+    cache_path = _result_cache_path(keyword, start_date, end_date)
     if st.button("開始爬取"):
         # 使用 Streamlit 提供的狀態元素，它們會自動更新
-        status_text = st.empty()
+        # 文字狀態合併成單一容器，每次刷新只送一則訊息而不是兩則
         progress_bar = st.progress(0)
-        article_status = st.empty()
-        
+        status_area = st.empty()
+
+        # 爬取在背景迴圈的執行緒上執行，那裡沒有 ScriptRunContext，
+        # 不能直接更新 st 元件；進度與文章都經由這個佇列交回主執行緒渲染
+        event_queue = queue.Queue()
+
         # 創建帶有進度更新的自定義回調
         class SimpleCallback:
             def __init__(self):
@@ -96,24 +154,39 @@ def main():
                 self.current_article = 0
                 self.total_articles = 0
                 self.latest_article = ""
-            
+                self._last_emit = 0.0  # 上次實際刷新前端的時間
+                self._batch_size = 1  # 每隔幾篇文章刷新一次
+
             def stage_update(self, stage):
                 self.current_stage = stage
-                self._update_display()
-            
+                self._update_display(force=True)  # 階段切換一定要顯示
+
             def page_update(self, current, total):
                 self.current_page = current
                 self.total_pages = total
                 self._update_display()
-            
+
             def article_update(self, current, total, title=""):
                 self.current_article = current
                 self.total_articles = total
+                # 大批文章時整場最多刷新 ~20 次就夠了
+                self._batch_size = max(1, total // 20)
                 if title:
                     self.latest_article = title
-                self._update_display()
-            
-            def _update_display(self):
+                # 最後一篇完成時強制刷新，讓進度條走到底
+                self._update_display(force=(current == total))
+
+            def _update_display(self, force=False):
+                # 節流 + 批次：每次更新都是一趟 WebSocket 往返，
+                # 只在批次邊界且距上次刷新超過 0.25 秒時才真的送出
+                now = time.monotonic()
+                if not force:
+                    if self.current_article % self._batch_size != 0:
+                        return
+                    if now - self._last_emit < 0.25:
+                        return
+                self._last_emit = now
+
                 # 計算總體進度
                 if self.total_articles > 0 and self.current_article > 0:
                     # 文章爬取階段
@@ -124,82 +197,178 @@ def main():
                 else:
                     overall_progress = 0.1  # 初始階段
                 
-                # 更新狀態顯示
-                progress_bar.progress(overall_progress)
-                status_text.text(f"階段: {self.current_stage} | 頁面: {self.current_page}/{self.total_pages}")
-                
+                # 更新狀態顯示（兩行狀態合併成一則訊息）
+                # 這裡只組訊息並丟進佇列，實際渲染由主執行緒的輪詢迴圈完成
                 article_info = f"文章: {self.current_article}/{self.total_articles}"
                 if self.latest_article:
                     article_info += f" | 最新: {self.latest_article[:30]}..."
-                article_status.text(article_info)
+                event_queue.put((
+                    "progress",
+                    overall_progress,
+                    f"階段: {self.current_stage} | 頁面: {self.current_page}/{self.total_pages}\n"
+                    f"{article_info}"
+                ))
         
         # 創建回調實例
         callback = SimpleCallback()
         callback.stage_update("開始爬取")
         
+        # 文章抓完一篇就即時顯示在這個預覽區，不必等整批結束
+        live_area = st.empty()
+
         with st.spinner("正在爬取文章..."):
             try:
-                # 修改異步爬取函數調用
                 async def run_scraper():
-                    scraper = UDNNewsScraper(headless=headless)
+                    # 實例單次使用，長駐瀏覽器仍在類別層級跨次共用
+                    scraper = make_scraper(headless)
                     try:
-                        return await scraper.scrape(
-                            keyword=keyword,
-                            start_date=start_date.strftime('%Y-%m-%d'),
-                            end_date=end_date.strftime('%Y-%m-%d'),
-                            manual_mode=manual_mode,
-                            max_articles=max_articles,
-                            progress_callback=callback
-                        )
+                        async for index, article in scraper.scrape_iter(
+                                keyword=keyword,
+                                start_date=start_date.strftime('%Y-%m-%d'),
+                                end_date=end_date.strftime('%Y-%m-%d'),
+                                manual_mode=manual_mode,
+                                max_articles=max_articles,
+                                max_parallel=max_parallel,
+                                progress_callback=callback):
+                            event_queue.put(("article", index, article))
                     finally:
                         await scraper.close()
-                
-                # 執行爬取
-                df = asyncio.get_event_loop().run_until_complete(run_scraper())
-                
-                # 清除進度顯示
-                status_text.empty()
+
+                # 執行爬取：把協程丟到長駐背景迴圈執行，
+                # 不必每次點擊都建立又銷毀一個事件迴圈
+                future = asyncio.run_coroutine_threadsafe(run_scraper(), get_background_loop())
+
+                # 主執行緒輪詢佇列，邊收邊渲染進度與即時預覽
+                import pandas as pd
+                records = {}
+                last_render = 0.0
+
+                def _handle_event(event):
+                    if event[0] == "article":
+                        _, index, article = event
+                        records[index] = article
+                    else:
+                        _, value, text = event
+                        progress_bar.progress(value)
+                        status_area.text(text)
+
+                while True:
+                    try:
+                        _handle_event(event_queue.get(timeout=0.25))
+                    except queue.Empty:
+                        pass
+                    done = future.done()
+                    if done:
+                        # 收尾：並行 worker 常在同一瞬間完成好幾篇，future 結束時
+                        # 佇列裡可能還積著一批文章，先撈乾再跳出，不然尾段會掉資料
+                        while True:
+                            try:
+                                _handle_event(event_queue.get_nowait())
+                            except queue.Empty:
+                                break
+                    now = time.monotonic()
+                    # 預覽刷新也要節流，每秒最多重畫一次（結束時強制畫最後一版）
+                    if records and (done or now - last_render > 1.0):
+                        last_render = now
+                        preview = pd.DataFrame.from_records(
+                            [records[i] for i in sorted(records)]
+                        )
+                        live_area.dataframe(
+                            preview[['Title', 'Date']] if 'Title' in preview.columns else preview,
+                            use_container_width=True,
+                            hide_index=True
+                        )
+                    if done:
+                        break
+
+                # 有例外的話在這裡重新拋出
+                future.result()
+
+                # 最終 DataFrame 沿用爬蟲模組的 schema 建構邏輯
+                from UDNNewsScraper import _build_dataframe
+                df = _build_dataframe([records[i] for i in sorted(records)])
+                scraped = True
+
+                # 清除進度顯示（即時預覽由下方正式的結果表格取代）
                 progress_bar.empty()
-                article_status.empty()
-                
-                # 處理結果
-                if not df.empty:
-                    st.success(f"爬取成功！共獲取 {len(df)} 篇文章")
-                    
-                    # 顯示數據預覽
-                    st.subheader("數據預覽")
-                    st.dataframe(df.head(10))
-                    
-                    # 如果有超過 10 筆，顯示完整數據的選項
-                    if len(df) > 10:
-                        show_all = st.checkbox("顯示所有數據")
-                        if show_all:
-                            st.dataframe(df)
-
-                    # 提供下載連結，使用預設樣式
-                    st.markdown(
-                        get_csv_download_link(df, f"udn_{keyword}_新聞資料.csv"),
-                        unsafe_allow_html=True
-                    )
-                    
-                    # 顯示一些統計信息
-                    st.subheader("統計信息")
-                    if 'Date' in df.columns:
-                        # 按日期統計文章數量
-                        date_counts = df['Date'].value_counts().sort_index()
-                        st.bar_chart(date_counts)
-                    
-                else:
-                    st.error("沒有抓取到任何資料！請嘗試不同的關鍵字或日期範圍。")
-            
+                status_area.empty()
+                live_area.empty()
+
             except Exception as e:
                 # 清除進度顯示
-                status_text.empty()
                 progress_bar.empty()
-                article_status.empty()
-                
+                status_area.empty()
+                live_area.empty()
+
                 st.error(f"爬取過程中發生錯誤: {str(e)}")
                 st.info("如果是瀏覽器相關錯誤，請嘗試重新啟動應用或使用 '手動登入模式'")
+    elif st.session_state.df is not None and st.session_state.df_path == cache_path:
+        # 同一組參數且 session 裡已有結果：重用同一個物件，
+        # 讓以 id 為 key 的序列化快取持續命中
+        df = st.session_state.df
+    elif os.path.exists(cache_path):
+        # 同一組參數爬過了：直接從 feather 快取載回上次結果，不必重爬
+        try:
+            import pandas as pd
+            df = pd.read_feather(cache_path)
+            st.session_state.df = df
+            st.session_state.df_path = cache_path
+            st.session_state.df_gen += 1
+        except Exception:
+            df = None
+    # 參數換了又沒有對應快取時不顯示任何結果，
+    # 以免把上一組查詢的資料當成新參數的結果呈現
+
+    # 處理結果（剛爬完或從快取載回都走同一段）
+    if scraped:
+        st.session_state.df = df
+        st.session_state.df_path = cache_path
+        st.session_state.df_gen += 1
+        if df is not None and not df.empty:
+            st.success(f"爬取成功！共獲取 {len(df)} 篇文章")
+            # 落地 feather 快取，之後的 rerun 毫秒級載回
+            try:
+                df.reset_index(drop=True).to_feather(cache_path)
+            except Exception:
+                pass  # pyarrow 不在時跳過快取，不影響主流程
+        else:
+            st.error("沒有抓取到任何資料！請嘗試不同的關鍵字或日期範圍。")
+
+    if df is not None and not df.empty:
+        # 顯示數據預覽：同一個表格在預覽與完整之間切換，
+        # 勾選「顯示所有數據」時不會前 10 筆和完整資料各傳一份到前端
+        st.subheader("數據預覽")
+        show_all = len(df) > 10 and st.checkbox("顯示所有數據")
+        # 世代序號 + 列數摻進快取 key，防止物件 id 被回收重用時誤中舊快取
+        df_key = (st.session_state.df_gen, len(df))
+        st.dataframe(df if show_all else get_preview(df, df_key), use_container_width=True, hide_index=True)
+
+        # 提供下載按鈕，檔案內容由 Streamlit 端點直接送出
+        st.download_button(
+            "下載爬取資料",
+            data=get_csv_bytes(df, df_key),
+            file_name=f"udn_{keyword}_新聞資料.csv",
+            mime="text/csv"
+        )
+        try:
+            st.download_button(
+                "下載爬取資料 (Parquet)",
+                data=get_parquet_bytes(df, df_key),
+                file_name=f"udn_{keyword}_新聞資料.parquet",
+                mime="application/octet-stream"
+            )
+        except Exception:
+            pass  # pyarrow 不在時只提供 CSV
+
+        # 顯示一些統計信息
+        st.subheader("統計信息")
+        if 'Date' in df.columns:
+            # 按日期統計文章數量：Grouper 直接在 datetime 欄位上按日分桶，
+            # 產出的索引天然有序，省掉 value_counts 的逐值雜湊與事後排序
+            import pandas as pd
+            chart_df = df.assign(Date=pd.to_datetime(df['Date'], errors='coerce'))
+            date_counts = chart_df.groupby(pd.Grouper(key='Date', freq='D')).size()
+            st.bar_chart(date_counts)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file